@@ -1,9 +1,19 @@
+import argparse
 import ctypes
+import functools
+import hashlib
 import json
+import math
+import multiprocessing
 import os
+import re
 import shlex
+import shutil
 import subprocess
 import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 
@@ -29,6 +39,70 @@ def save_config(path, config):
         json.dump(config, f, indent=2)
 
 
+def sidecar_path(config_path, suffix):
+    base, _ = os.path.splitext(config_path)
+    return base + suffix
+
+
+def load_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_json_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def append_usage_event(path, event):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+
+def count_usage_events(path):
+    try:
+        with open(path, "rb") as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 0
+
+
+def trim_usage_log(path, keep):
+    with open(path, "r", encoding="utf-8") as f:
+        lines = deque(f, maxlen=keep)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    os.replace(tmp_path, path)
+    return len(lines)
+
+
+def read_usage_events(path):
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+@functools.lru_cache(maxsize=256)
+def resolve_command(command):
+    if os.path.exists(command):
+        return command
+    return shutil.which(command) or command
+
+
 def parse_args(text):
     if not text.strip():
         return []
@@ -141,15 +215,366 @@ def open_command(entry, parent=None):
             os.startfile(command)  # type: ignore[attr-defined]
             return
         if isinstance(command, list):
-            cmd = command
+            cmd = list(command)
         else:
-            cmd = [command]
+            cmd = [resolve_command(command)]
         cmd.extend(args)
         subprocess.Popen(cmd, cwd=cwd or None)
     except Exception as exc:
         QtWidgets.QMessageBox.critical(parent, APP_TITLE, f"Failed to launch:\n{exc}")
 
 
+def valid_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def valid_stat_table(table):
+    return isinstance(table, dict) and all(
+        isinstance(stat, dict)
+        and valid_count(stat.get("count"))
+        and isinstance(stat.get("hours"), list)
+        and len(stat["hours"]) == 24
+        and all(valid_count(count) for count in stat["hours"])
+        for stat in table.values()
+    )
+
+
+def valid_usage(data):
+    if not isinstance(data, dict):
+        return False
+    transitions = data.get("transitions", {})
+    return (
+        valid_stat_table(data.get("modes", {}))
+        and valid_stat_table(data.get("buttons", {}))
+        and isinstance(transitions, dict)
+        and all(
+            isinstance(row, dict) and all(valid_count(count) for count in row.values())
+            for row in transitions.values()
+        )
+        and isinstance(data.get("preload", {}), dict)
+    )
+
+
+class UsageStats:
+    def __init__(self, data=None):
+        if not valid_usage(data):
+            data = {}
+        self.modes = data.get("modes", {})
+        self.buttons = data.get("buttons", {})
+        self.transitions = data.get("transitions", {})
+        self.preload = data.get("preload", {})
+
+    def to_dict(self):
+        return {
+            "modes": self.modes,
+            "buttons": self.buttons,
+            "transitions": self.transitions,
+            "preload": self.preload,
+        }
+
+    def _bump(self, table, key, hour):
+        stat = table.setdefault(key, {"count": 0, "hours": [0] * 24})
+        stat["count"] += 1
+        stat["hours"][hour] += 1
+
+    def record_mode(self, previous, name, hour):
+        self._bump(self.modes, name, hour)
+        if previous is not None and previous != name:
+            row = self.transitions.setdefault(previous, {})
+            row[name] = row.get(name, 0) + 1
+
+    def record_press(self, mode_name, label, hour):
+        self._bump(self.buttons, f"{mode_name}/{label}", hour)
+
+    def press_count(self, mode_name, label):
+        stat = self.buttons.get(f"{mode_name}/{label}")
+        return stat["count"] if stat else 0
+
+    def predict_modes(self, current, rings, hour, limit=2):
+        row = self.transitions.get(current, {})
+        scored = []
+        seen = {current}
+        for distance, ring in enumerate(rings):
+            for name in ring:
+                if name in seen:
+                    continue
+                seen.add(name)
+                stat = self.modes.get(name)
+                hour_count = stat["hours"][hour] if stat else 0
+                total = stat["count"] if stat else 0
+                score = row.get(name, 0) * 4 + hour_count * 2 + total * 0.1
+                scored.append((distance, -score, name))
+        scored.sort(key=lambda item: item[:2])
+        return [name for _, _, name in scored[:limit]]
+
+
+class IconCache:
+    def __init__(self, budget_bytes):
+        self.budget = budget_bytes
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries = OrderedDict()
+        self._warm_formats = set()
+
+    def _decode(self, path, size, ratio):
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix not in self._warm_formats:
+            self._warm_formats.add(suffix)
+            QtGui.QImage(path)
+        start = time.perf_counter()
+        icon = QtGui.QIcon(path)
+        pixmap = icon.pixmap(QtCore.QSize(size, size), ratio)
+        return icon, pixmap, time.perf_counter() - start
+
+    def _store(self, key, icon, pixmap, credit):
+        cost = pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+        for source in icon.availableSizes():
+            cost += source.width() * source.height() * 4
+        if cost > self.budget:
+            return False
+        while self._entries and self.used + cost > self.budget:
+            _, (_, old_cost, _) = self._entries.popitem(last=False)
+            self.used -= old_cost
+        self._entries[key] = [icon, cost, credit]
+        self.used += cost
+        return True
+
+    def preload(self, path, size, ratio=1.0):
+        key = (path, size, ratio)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return True
+        icon, pixmap, elapsed = self._decode(path, size, ratio)
+        if pixmap.isNull():
+            return False
+        return self._store(key, icon, pixmap, elapsed)
+
+    def icon(self, path, size, ratio=1.0):
+        key = (path, size, ratio)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[2]
+            entry[2] = 0.0
+            return entry[0]
+        self.misses += 1
+        icon, pixmap, _ = self._decode(path, size, ratio)
+        if pixmap.isNull():
+            return None
+        self._store(key, icon, pixmap, 0.0)
+        return icon
+
+
+def config_icon_size(config):
+    button_w = int(config.get("button_width", 220))
+    button_h = int(config.get("button_height", 130))
+    return int(config.get("icon_size", min(button_w, button_h) * 0.4))
+
+
+def config_modes(config):
+    modes = config.get("modes")
+    if not isinstance(modes, list) or not modes:
+        default_buttons = config.get("buttons", [])
+        default_name = config.get("default_mode", "Default")
+        modes = [{"name": default_name, "buttons": default_buttons}]
+    return modes
+
+
+def mode_rings(current, count, limit):
+    rings = []
+    seen = {current}
+    step = 1
+    while step < count and sum(len(ring) for ring in rings) < max(2, limit):
+        ring = []
+        for index in ((current + step) % count, (current - step) % count):
+            if index not in seen:
+                seen.add(index)
+                ring.append(index)
+        if ring:
+            rings.append(ring)
+        step += 1
+    return rings
+
+
+def preload_report(predictions, prediction_hits, cache):
+    lookups = cache.hits + cache.misses
+    return {
+        "predictions": predictions,
+        "prediction_hits": prediction_hits,
+        "hit_rate": round(prediction_hits / predictions, 3) if predictions else 0.0,
+        "icon_hits": cache.hits,
+        "icon_misses": cache.misses,
+        "icon_hit_rate": round(cache.hits / lookups, 3) if lookups else 0.0,
+        "saved_ms": round(cache.saved_seconds * 1000, 2),
+        "budget_used_kb": cache.used // 1024,
+    }
+
+
+def replay_usage(config, events):
+    modes = config_modes(config)
+    names = [mode.get("name", f"Mode {i + 1}") for i, mode in enumerate(modes)]
+    indexes = {}
+    for index, name in enumerate(names):
+        indexes.setdefault(name, index)
+    icon_size = config_icon_size(config)
+    limit = int(config.get("preload_modes", 2))
+    cache = IconCache(int(config.get("preload_budget_kb", 16384)) * 1024)
+    stats = UsageStats()
+    currents = {}
+    predicted_by_slot = {}
+    predictions = 0
+    hits = 0
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        name = event.get("m")
+        stamp = event.get("t", 0)
+        slot = event.get("w", 0)
+        if not isinstance(name, str) or name not in indexes or not isinstance(slot, int):
+            continue
+        if isinstance(stamp, bool) or not isinstance(stamp, (int, float)):
+            continue
+        try:
+            hour = time.localtime(stamp).tm_hour
+        except (OverflowError, OSError, ValueError):
+            continue
+        if "b" in event:
+            stats.record_press(name, event["b"], hour)
+            continue
+        if event.get("s"):
+            currents.pop(slot, None)
+            predicted_by_slot.pop(slot, None)
+        current = currents.get(slot)
+        predicted = predicted_by_slot.get(slot, [])
+        if current is not None:
+            predictions += 1
+            if name in predicted:
+                hits += 1
+        stats.record_mode(current, name, hour)
+        for entry in modes[indexes[name]].get("buttons", []):
+            if entry.get("icon"):
+                cache.icon(entry["icon"], icon_size)
+        currents[slot] = name
+        rings = mode_rings(indexes[name], len(modes), limit)
+        predicted = stats.predict_modes(
+            name, [[names[i] for i in ring] for ring in rings], hour, limit
+        )
+        predicted_by_slot[slot] = predicted
+        for target in predicted:
+            buttons = sorted(
+                modes[indexes[target]].get("buttons", []),
+                key=lambda e, n=target: -stats.press_count(n, e.get("label", "")),
+            )
+            for entry in buttons:
+                if entry.get("icon"):
+                    cache.preload(entry["icon"], icon_size)
+    return preload_report(predictions, hits, cache)
+
+
+class DeckHistory:
+    def __init__(self, depth=50):
+        self.undo_steps = deque(maxlen=max(0, depth))
+        self.redo_steps = []
+
+    def record(self, index, before, after):
+        self.undo_steps.append((index, before, after))
+        self.redo_steps.clear()
+
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def undo(self):
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        self.redo_steps.append(step)
+        return step
+
+    def redo(self):
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        return step
+
+
+def modes_hash(modes):
+    data = json.dumps(modes, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def dump_history(history, modes):
+    buttons, button_refs = [], {}
+    mode_table, mode_refs = [], {}
+
+    def button_ref(entry):
+        if id(entry) not in button_refs:
+            button_refs[id(entry)] = len(buttons)
+            buttons.append(entry)
+        return button_refs[id(entry)]
+
+    def mode_ref(mode):
+        if mode is None:
+            return None
+        if id(mode) not in mode_refs:
+            mode_refs[id(mode)] = len(mode_table)
+            refs = [button_ref(entry) for entry in mode.get("buttons", [])]
+            mode_table.append(dict(mode, buttons=refs))
+        return mode_refs[id(mode)]
+
+    def steps(items):
+        return [[index, mode_ref(before), mode_ref(after)] for index, before, after in items]
+
+    return {
+        "hash": modes_hash(modes),
+        "undo": steps(history.undo_steps),
+        "redo": steps(history.redo_steps),
+        "modes": mode_table,
+        "buttons": buttons,
+    }
+
+
+def load_history(data, modes, depth):
+    history = DeckHistory(depth)
+    if not isinstance(data, dict) or data.get("hash") != modes_hash(modes):
+        return history
+    try:
+        buttons = data.get("buttons", [])
+        table = [
+            dict(mode, buttons=[buttons[ref] for ref in mode.get("buttons", [])])
+            for mode in data.get("modes", [])
+        ]
+
+        def resolve(ref):
+            if ref is None:
+                return None
+            if not isinstance(ref, int) or ref < 0:
+                raise IndexError(ref)
+            return table[ref]
+
+        def steps(items):
+            loaded = []
+            for index, before, after in items:
+                if not isinstance(index, int) or index < 0:
+                    raise IndexError(index)
+                loaded.append((index, resolve(before), resolve(after)))
+            return loaded
+
+        undo_steps = steps(data.get("undo", []))
+        redo_steps = steps(data.get("redo", []))
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return history
+    history.undo_steps.extend(undo_steps)
+    history.redo_steps.extend(redo_steps)
+    return history
+
+
 class EditDialog(QtWidgets.QDialog):
     def __init__(self, parent=None, entry=None):
         super().__init__(parent)
@@ -348,28 +773,230 @@ class ShortcutCaptureDialog(QtWidgets.QDialog):
             self.accept()
 
 
-class TouchDeck(QtWidgets.QMainWindow):
+class ShortcutRegistry:
+    def __init__(self):
+        self._bindings = {}
+        self._shortcuts = []
+        self._fallbacks = {}
+        app = QtGui.QGuiApplication.instance()
+        if app is not None:
+            app.focusWindowChanged.connect(self.update_fallbacks)
+
+    def bind(self, window, buttons):
+        self._bindings[window] = [entry for entry in buttons if entry.get("shortcut")]
+        self.rebuild()
+
+    def unbind(self, window):
+        if self._bindings.pop(window, None) is not None:
+            self.rebuild()
+
+    def claimed(self, window):
+        keys = {
+            QtGui.QKeySequence(entry.get("shortcut")).toString()
+            for entry in self._bindings.get(window, [])
+        }
+        reserved = getattr(window, "reserved_shortcuts", None)
+        if reserved is not None:
+            keys.update(reserved())
+        return keys
+
+    def rebuild(self):
+        for sc in self._shortcuts:
+            sc.setEnabled(False)
+            sc.deleteLater()
+        self._shortcuts = []
+        self._fallbacks = {}
+        for window, entries in self._bindings.items():
+            seen = set()
+            for entry in entries:
+                sequence = QtGui.QKeySequence(entry.get("shortcut"))
+                key = sequence.toString()
+                if key in seen:
+                    continue
+                seen.add(key)
+                sc = QtGui.QShortcut(sequence, window)
+                sc.setContext(QtCore.Qt.ShortcutContext.WindowShortcut)
+                sc.activated.connect(lambda w=window, e=entry: w.launch_shortcut(e))
+                self._shortcuts.append(sc)
+                if key not in self._fallbacks:
+                    fallback = QtGui.QShortcut(sequence, window)
+                    fallback.setContext(QtCore.Qt.ShortcutContext.ApplicationShortcut)
+                    fallback.activated.connect(lambda w=window, e=entry: w.launch_shortcut(e))
+                    self._fallbacks[key] = fallback
+                    self._shortcuts.append(fallback)
+        self.update_fallbacks()
+
+    def update_fallbacks(self, *_):
+        claimed = self.claimed(QtWidgets.QApplication.activeWindow())
+        for key, fallback in self._fallbacks.items():
+            fallback.setEnabled(key not in claimed)
+
+
+class DeckModel(QtCore.QObject):
+    mode_changed = QtCore.pyqtSignal(int)
+    modes_reset = QtCore.pyqtSignal()
+
     def __init__(self, config_path):
         super().__init__()
         self.config_path = config_path
         self.config = load_config(config_path)
-        self.modes = self.config.get("modes")
-        if not isinstance(self.modes, list) or not self.modes:
-            default_buttons = self.config.get("buttons", [])
-            default_name = self.config.get("default_mode", "Default")
-            self.modes = [{"name": default_name, "buttons": default_buttons}]
+        self.modes = config_modes(self.config)
+        self.windows = []
+        self.shortcuts = ShortcutRegistry()
+
+        self.history_path = sidecar_path(config_path, ".history.json")
+        self.history = load_history(
+            load_json(self.history_path),
+            self.modes,
+            int(self.config.get("undo_depth", 50)),
+        )
+
+        self.usage_path = sidecar_path(config_path, ".usage.json")
+        self.usage_log_path = sidecar_path(config_path, ".usage.log")
+        self.usage_log_limit = int(self.config.get("usage_log_limit", 5000))
+        self.usage_log_count = count_usage_events(self.usage_log_path)
+        self.usage = UsageStats(load_json(self.usage_path))
+        budget_kb = int(self.config.get("preload_budget_kb", 16384))
+        self.icon_cache = IconCache(budget_kb * 1024)
+        self.predictions = 0
+        self.prediction_hits = 0
+        self._usage_save_timer = QtCore.QTimer(self)
+        self._usage_save_timer.setSingleShot(True)
+        self._usage_save_timer.setInterval(2000)
+        self._usage_save_timer.timeout.connect(self.persist_usage)
+
+    def window_configs(self):
+        windows = self.config.get("windows")
+        if not isinstance(windows, list) or not windows:
+            return [{}]
+        return windows
+
+    def window_config(self, slot):
+        return dict(self.config, **self.window_configs()[slot])
+
+    def replace_mode(self, index, mode):
+        before = self.modes[index]
+        self.modes[index] = mode
+        self.history.record(index, before, mode)
+        self.mode_changed.emit(index)
+
+    def append_mode(self, mode):
+        self.modes.append(mode)
+        self.history.record(len(self.modes) - 1, None, mode)
+        self.modes_reset.emit()
+        return len(self.modes) - 1
+
+    def undo(self):
+        step = self.history.undo()
+        if step is None:
+            return None
+        index, before, after = step
+        return self.apply_mode_change(index, before)
+
+    def redo(self):
+        step = self.history.redo()
+        if step is None:
+            return None
+        index, before, after = step
+        return self.apply_mode_change(index, after)
+
+    def apply_mode_change(self, index, mode):
+        if mode is None:
+            del self.modes[index]
+            self.modes_reset.emit()
+        elif index == len(self.modes):
+            self.modes.append(mode)
+            self.modes_reset.emit()
+        else:
+            self.modes[index] = mode
+            self.mode_changed.emit(index)
+        return min(index, len(self.modes) - 1)
+
+    def persist(self):
+        self.config["modes"] = self.modes
+        if self.windows:
+            self.config["current_mode_index"] = self.windows[0].current_mode_index
+        if isinstance(self.config.get("windows"), list):
+            for window in self.windows:
+                self.config["windows"][window.slot]["current_mode_index"] = window.current_mode_index
+        self.config.pop("buttons", None)
+        save_config(self.config_path, self.config)
+        try:
+            save_json_atomic(self.history_path, dump_history(self.history, self.modes))
+        except OSError:
+            pass
+
+    def log_usage(self, event):
+        if not bool(self.config.get("usage_tracking", True)):
+            return
+        try:
+            append_usage_event(self.usage_log_path, event)
+            self.usage_log_count += 1
+            if self.usage_log_count > 2 * self.usage_log_limit:
+                self.usage_log_count = trim_usage_log(self.usage_log_path, self.usage_log_limit)
+        except OSError:
+            pass
+        self._usage_save_timer.start()
+
+    def preload_report(self):
+        return preload_report(self.predictions, self.prediction_hits, self.icon_cache)
+
+    def persist_usage(self):
+        self._usage_save_timer.stop()
+        if not bool(self.config.get("usage_tracking", True)):
+            return
+        self.usage.preload = self.preload_report()
+        try:
+            save_json_atomic(self.usage_path, self.usage.to_dict())
+        except OSError:
+            pass
+
+
+class TouchDeck(QtWidgets.QMainWindow):
+    def __init__(self, config_path=None, model=None, slot=0):
+        super().__init__()
+        self.model = model or DeckModel(config_path)
+        self.model.windows.append(self)
+        self.slot = slot
+        self.config_path = self.model.config_path
+        self.config = self.model.window_config(slot)
         self.current_mode_index = int(self.config.get("current_mode_index", 0))
         if self.current_mode_index < 0 or self.current_mode_index >= len(self.modes):
             self.current_mode_index = 0
         self.buttons = self.current_mode().get("buttons", [])
         self.edit_mode = False
         self._press_pos = None
-        self._shortcuts = []
+        self._add_entry = {"label": "+ Add", "_add": True}
+        self.tiles = []
+
+        self._predicted_modes = set()
+        self._preload_queue = deque()
+        self._preload_timer = QtCore.QTimer(self)
+        self._preload_timer.setInterval(0)
+        self._preload_timer.timeout.connect(self.preload_step)
+        self.model.mode_changed.connect(self.on_mode_changed)
+        self.model.modes_reset.connect(self.on_modes_reset)
 
         self.setWindowTitle(APP_TITLE)
         self.setStyleSheet(self.build_style())
         self.init_ui()
 
+    @property
+    def modes(self):
+        return self.model.modes
+
+    @property
+    def history(self):
+        return self.model.history
+
+    @property
+    def usage(self):
+        return self.model.usage
+
+    @property
+    def icon_cache(self):
+        return self.model.icon_cache
+
     def build_style(self):
         bg = self.config.get("background", "#0E1014")
         btn_bg = self.config.get("button_color", "#1B2230")
@@ -410,12 +1037,23 @@ class TouchDeck(QtWidgets.QMainWindow):
     def init_ui(self):
         fullscreen = bool(self.config.get("fullscreen", True))
         self.is_fullscreen = fullscreen
+        origin = QtCore.QPoint(0, 0)
+        screens = QtGui.QGuiApplication.screens()
+        screen_index = self.config.get("screen")
+        if screen_index is not None and 0 <= int(screen_index) < len(screens):
+            origin = screens[int(screen_index)].geometry().topLeft()
         if fullscreen:
+            self.move(origin)
             self.showFullScreen()
         else:
             width = int(self.config.get("window_width", 1000))
             height = int(self.config.get("window_height", 650))
-            self.setGeometry(0, 0, width, height)
+            self.setGeometry(
+                origin.x() + int(self.config.get("window_x", 0)),
+                origin.y() + int(self.config.get("window_y", 0)),
+                width,
+                height,
+            )
 
         root = QtWidgets.QWidget()
         root_layout = QtWidgets.QVBoxLayout(root)
@@ -442,6 +1080,7 @@ class TouchDeck(QtWidgets.QMainWindow):
             self.header.installEventFilter(self)
 
         self.update_mode_title()
+        self.record_mode()
         self.render_buttons()
         self.bind_shortcuts()
 
@@ -464,119 +1103,223 @@ class TouchDeck(QtWidgets.QMainWindow):
         self.add_mode_btn.setVisible(False)
         self.add_mode_btn.clicked.connect(self.add_mode)
 
+        self.undo_btn = QtWidgets.QPushButton("Undo")
+        self.undo_btn.setObjectName("EditToggle")
+        self.undo_btn.setVisible(False)
+        self.undo_btn.clicked.connect(self.undo)
+
+        self.redo_btn = QtWidgets.QPushButton("Redo")
+        self.redo_btn.setObjectName("EditToggle")
+        self.redo_btn.setVisible(False)
+        self.redo_btn.clicked.connect(self.redo)
+
         self.edit_btn = QtWidgets.QPushButton("Edit")
         self.edit_btn.setObjectName("EditToggle")
         self.edit_btn.clicked.connect(self.toggle_edit)
 
         layout.addWidget(title, 1)
+        layout.addWidget(self.undo_btn, 0, QtCore.Qt.AlignmentFlag.AlignRight)
+        layout.addWidget(self.redo_btn, 0, QtCore.Qt.AlignmentFlag.AlignRight)
         layout.addWidget(self.add_mode_btn, 0, QtCore.Qt.AlignmentFlag.AlignRight)
         layout.addWidget(self.edit_btn, 0, QtCore.Qt.AlignmentFlag.AlignRight)
         return header
 
     def clear_grid(self):
+        self.tiles = []
         while self.grid_layout.count():
             item = self.grid_layout.takeAt(0)
             widget = item.widget()
             if widget is not None:
                 widget.deleteLater()
 
-    def render_buttons(self):
-        self.clear_grid()
+    def grid_columns(self):
+        return int(self.config.get("grid_columns", self.config.get("columns", 4)))
 
-        columns = int(self.config.get("grid_columns", self.config.get("columns", 4)))
-        rows = self.config.get("grid_rows")
-        rows = int(rows) if rows is not None else None
-        button_w = int(self.config.get("button_width", 220))
-        button_h = int(self.config.get("button_height", 130))
+    def tile_font(self):
         font_text = self.config.get("font", "Segoe UI 18 bold")
         font = QtGui.QFont()
         font.setFamily(font_text.split()[0])
         size = [p for p in font_text.split() if p.isdigit()]
         font.setPointSize(int(size[0]) if size else 18)
         font.setBold("bold" in font_text.lower())
+        return font
 
+    def visible_buttons(self):
         self.buttons = self.current_mode().get("buttons", [])
         visible_buttons = list(self.buttons)
         if self.edit_mode:
-            visible_buttons.append({"label": "+ Add", "_add": True})
+            visible_buttons.append(self._add_entry)
+        return visible_buttons
 
-        for idx, entry in enumerate(visible_buttons):
-            row = idx // columns
-            col = idx % columns
-
-            btn = QtWidgets.QPushButton(entry.get("label", f"Button {idx + 1}"))
-            btn.setObjectName("Tile")
-            btn.setFont(font)
-            btn.setMinimumSize(button_w, button_h)
-            btn.setSizePolicy(
-                QtWidgets.QSizePolicy.Policy.Expanding,
-                QtWidgets.QSizePolicy.Policy.Expanding,
-            )
-            btn.installEventFilter(self)
-            if entry.get("color") or entry.get("text_color"):
-                bg_color = entry.get("color") or "transparent"
-                text_color = entry.get("text_color")
-                text_rule = f"color: {text_color};" if text_color else ""
-                btn.setStyleSheet(
-                    "QPushButton {"
-                    f"background: {bg_color};"
-                    f"{text_rule}"
-                    "}"
-                    "QPushButton:hover {"
-                    f"background: {bg_color};"
-                    f"{text_rule}"
-                    "}"
-                )
-            icon_path = entry.get("icon")
-            if icon_path:
-                icon = QtGui.QIcon(icon_path)
-                if not icon.isNull():
-                    icon_size = int(
-                        self.config.get(
-                            "icon_size", min(button_w, button_h) * 0.4
-                        )
-                    )
-                    btn.setIcon(icon)
-                    btn.setIconSize(QtCore.QSize(icon_size, icon_size))
-            if entry.get("_add"):
-                btn.clicked.connect(self.add_button)
-            else:
-                btn.clicked.connect(lambda _, e=entry, i=idx: self.on_button(e, i))
+    def build_tile(self, entry, idx, font):
+        button_w = int(self.config.get("button_width", 220))
+        button_h = int(self.config.get("button_height", 130))
+        btn = QtWidgets.QPushButton(entry.get("label", f"Button {idx + 1}"))
+        btn.setObjectName("Tile")
+        btn.setFont(font)
+        btn.setMinimumSize(button_w, button_h)
+        btn.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding,
+            QtWidgets.QSizePolicy.Policy.Expanding,
+        )
+        btn.installEventFilter(self)
+        if entry.get("color") or entry.get("text_color"):
+            bg_color = entry.get("color") or "transparent"
+            text_color = entry.get("text_color")
+            text_rule = f"color: {text_color};" if text_color else ""
+            btn.setStyleSheet(
+                "QPushButton {"
+                f"background: {bg_color};"
+                f"{text_rule}"
+                "}"
+                "QPushButton:hover {"
+                f"background: {bg_color};"
+                f"{text_rule}"
+                "}"
+            )
+        icon_path = entry.get("icon")
+        if icon_path:
+            icon_size = self.icon_size()
+            icon = self.icon_cache.icon(icon_path, icon_size, self.devicePixelRatioF())
+            if icon is not None:
+                btn.setIcon(icon)
+                btn.setIconSize(QtCore.QSize(icon_size, icon_size))
+        if entry.get("_add"):
+            btn.clicked.connect(self.add_button)
+        else:
+            btn.clicked.connect(lambda _, e=entry: self.on_button(e, self.button_index(e)))
+        return btn
 
-            self.grid_layout.addWidget(btn, row, col)
+    def button_index(self, entry):
+        return next(i for i, e in enumerate(self.buttons) if e is entry)
 
-        row_count = rows if rows is not None else max(1, (len(visible_buttons) + columns - 1) // columns)
+    def apply_stretch(self, count):
+        columns = self.grid_columns()
+        rows = self.config.get("grid_rows")
+        rows = int(rows) if rows is not None else None
+        row_count = rows if rows is not None else max(1, (count + columns - 1) // columns)
         for r in range(row_count):
             self.grid_layout.setRowStretch(r, 1)
         for c in range(columns):
             self.grid_layout.setColumnStretch(c, 1)
+
+    def render_buttons(self):
+        self.clear_grid()
+
+        columns = self.grid_columns()
+        font = self.tile_font()
+        visible_buttons = self.visible_buttons()
+        for idx, entry in enumerate(visible_buttons):
+            btn = self.build_tile(entry, idx, font)
+            self.grid_layout.addWidget(btn, idx // columns, idx % columns)
+            self.tiles.append((entry, btn))
+
+        self.apply_stretch(len(visible_buttons))
+        self.rebuild_shortcuts()
+        self.schedule_preload()
+
+    def update_tiles(self):
+        columns = self.grid_columns()
+        font = None
+        available = {}
+        for entry, tile in self.tiles:
+            available.setdefault(id(entry), []).append(tile)
+        visible_buttons = self.visible_buttons()
+        tiles = []
+        for idx, entry in enumerate(visible_buttons):
+            reused = available.get(id(entry))
+            if reused:
+                tiles.append((entry, reused.pop(0), True))
+                continue
+            if font is None:
+                font = self.tile_font()
+            tiles.append((entry, self.build_tile(entry, idx, font), False))
+        for stale in available.values():
+            for tile in stale:
+                self.grid_layout.removeWidget(tile)
+                tile.deleteLater()
+        for idx, (entry, tile, reused) in enumerate(tiles):
+            position = (idx // columns, idx % columns)
+            if reused:
+                current = self.grid_layout.getItemPosition(self.grid_layout.indexOf(tile))
+                if current[:2] == position:
+                    continue
+                self.grid_layout.removeWidget(tile)
+            self.grid_layout.addWidget(tile, *position)
+        self.tiles = [(entry, tile) for entry, tile, _ in tiles]
+
+        self.apply_stretch(len(visible_buttons))
         self.rebuild_shortcuts()
+        self.schedule_preload()
+
+    def icon_size(self):
+        return config_icon_size(self.config)
 
     def on_button(self, entry, index):
         if not self.edit_mode:
+            self.record_press(entry)
             open_command(entry, self)
             return
 
         dialog = EditDialog(self, entry=entry)
         if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             updated = dialog.result_entry()
+            buttons = list(self.buttons)
             if updated == "DELETE":
-                del self.buttons[index]
+                del buttons[index]
             elif isinstance(updated, dict):
-                self.buttons[index] = updated
+                buttons[index] = updated
             else:
                 return
-            self.persist_config()
-            self.render_buttons()
+            self.edit_current_mode(buttons)
 
     def add_button(self):
         dialog = EditDialog(self)
         if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             updated = dialog.result_entry()
             if isinstance(updated, dict):
-                self.buttons.append(updated)
-                self.persist_config()
-                self.render_buttons()
+                self.edit_current_mode(self.buttons + [updated])
+
+    def edit_current_mode(self, buttons):
+        index = self.current_mode_index
+        self.model.replace_mode(index, dict(self.modes[index], buttons=buttons))
+        self.persist_config()
+
+    def undo(self):
+        if not self.edit_mode:
+            return
+        index = self.model.undo()
+        if index is not None:
+            self.show_mode(index)
+            self.persist_config()
+
+    def redo(self):
+        if not self.edit_mode:
+            return
+        index = self.model.redo()
+        if index is not None:
+            self.show_mode(index)
+            self.persist_config()
+
+    def show_mode(self, index):
+        if index == self.current_mode_index:
+            return
+        self.current_mode_index = index
+        self.update_mode_title()
+        self.render_buttons()
+
+    def on_mode_changed(self, index):
+        self.update_history_buttons()
+        if index == self.current_mode_index:
+            self.update_mode_title()
+            self.update_tiles()
+
+    def on_modes_reset(self):
+        self.update_history_buttons()
+        if self.current_mode_index >= len(self.modes):
+            self.current_mode_index = len(self.modes) - 1
+            self.update_mode_title()
+            self.render_buttons()
 
     def toggle_edit(self):
         self.edit_mode = not self.edit_mode
@@ -584,7 +1327,22 @@ class TouchDeck(QtWidgets.QMainWindow):
             self.edit_btn.setText("Done" if self.edit_mode else "Edit")
         if hasattr(self, "add_mode_btn"):
             self.add_mode_btn.setVisible(self.edit_mode)
-        self.render_buttons()
+        if hasattr(self, "undo_btn"):
+            self.undo_btn.setVisible(self.edit_mode)
+            self.redo_btn.setVisible(self.edit_mode)
+        for sc in getattr(self, "history_shortcuts", []):
+            sc.setEnabled(self.edit_mode)
+        self.update_history_buttons()
+        self.update_tiles()
+
+    def reserved_shortcuts(self):
+        shortcuts = getattr(self, "mode_shortcuts", []) + getattr(self, "history_shortcuts", [])
+        return {sc.key().toString() for sc in shortcuts if sc.isEnabled()}
+
+    def update_history_buttons(self):
+        if hasattr(self, "undo_btn"):
+            self.undo_btn.setEnabled(self.history.can_undo())
+            self.redo_btn.setEnabled(self.history.can_redo())
 
     def bind_shortcuts(self):
         esc = QtGui.QShortcut(QtGui.QKeySequence("Esc"), self)
@@ -593,17 +1351,40 @@ class TouchDeck(QtWidgets.QMainWindow):
         f11 = QtGui.QShortcut(QtGui.QKeySequence("F11"), self)
         f11.activated.connect(self.toggle_fullscreen)
 
+        self.mode_shortcuts = []
+        mode_context = QtCore.Qt.ShortcutContext.ApplicationShortcut
+        if len(self.model.window_configs()) > 1:
+            mode_context = QtCore.Qt.ShortcutContext.WindowShortcut
+
         prev_seq = self.config.get("prev_mode_shortcut", "Ctrl+Left")
         if prev_seq:
             prev = QtGui.QShortcut(QtGui.QKeySequence(prev_seq), self)
-            prev.setContext(QtCore.Qt.ShortcutContext.ApplicationShortcut)
+            prev.setContext(mode_context)
             prev.activated.connect(self.prev_mode)
+            self.mode_shortcuts.append(prev)
 
         next_seq = self.config.get("next_mode_shortcut", "Ctrl+Right")
         if next_seq:
             next_sc = QtGui.QShortcut(QtGui.QKeySequence(next_seq), self)
-            next_sc.setContext(QtCore.Qt.ShortcutContext.ApplicationShortcut)
+            next_sc.setContext(mode_context)
             next_sc.activated.connect(self.next_mode)
+            self.mode_shortcuts.append(next_sc)
+
+        self.history_shortcuts = []
+        undo_seq = self.config.get("undo_shortcut", "Ctrl+Z")
+        if undo_seq:
+            undo_sc = QtGui.QShortcut(QtGui.QKeySequence(undo_seq), self)
+            undo_sc.activated.connect(self.undo)
+            self.history_shortcuts.append(undo_sc)
+
+        redo_seq = self.config.get("redo_shortcut", "Ctrl+Y")
+        if redo_seq:
+            redo_sc = QtGui.QShortcut(QtGui.QKeySequence(redo_seq), self)
+            redo_sc.activated.connect(self.redo)
+            self.history_shortcuts.append(redo_sc)
+        for sc in self.history_shortcuts:
+            sc.setEnabled(self.edit_mode)
+        self.model.shortcuts.update_fallbacks()
 
     def exit_fullscreen(self):
         if self.is_fullscreen:
@@ -630,49 +1411,112 @@ class TouchDeck(QtWidgets.QMainWindow):
         self.setWindowTitle(title_text)
 
     def rebuild_shortcuts(self):
-        self._shortcuts = []
-        for entry in self.buttons:
-            shortcut = entry.get("shortcut")
-            if not shortcut:
-                continue
-            sc = QtGui.QShortcut(QtGui.QKeySequence(shortcut), self)
-            sc.setContext(QtCore.Qt.ShortcutContext.ApplicationShortcut)
-            sc.activated.connect(lambda e=entry: self.launch_shortcut(e))
-            self._shortcuts.append(sc)
+        self.model.shortcuts.bind(self, [] if self.edit_mode else self.buttons)
 
     def launch_shortcut(self, entry):
         if self.edit_mode:
             return
+        self.record_press(entry)
         open_command(entry, self)
+
+    def mode_name(self, index):
+        return self.modes[index].get("name", f"Mode {index + 1}")
+
+    def record_mode(self, previous_index=None):
+        now = time.time()
+        name = self.mode_name(self.current_mode_index)
+        previous = self.mode_name(previous_index) if previous_index is not None else None
+        if previous_index is not None:
+            self.model.predictions += 1
+            if self.current_mode_index in self._predicted_modes:
+                self.model.prediction_hits += 1
+        self.usage.record_mode(previous, name, time.localtime(now).tm_hour)
+        event = {"t": int(now), "w": self.slot, "m": name}
+        if previous_index is None:
+            event["s"] = 1
+        self.model.log_usage(event)
+
+    def record_press(self, entry):
+        now = time.time()
+        name = self.mode_name(self.current_mode_index)
+        label = entry.get("label", "")
+        self.usage.record_press(name, label, time.localtime(now).tm_hour)
+        self.model.log_usage({"t": int(now), "w": self.slot, "m": name, "b": label})
+
+    def preload_report(self):
+        return self.model.preload_report()
+
+    def schedule_preload(self):
+        self._preload_queue.clear()
+        self._predicted_modes = set()
+        if not bool(self.config.get("preload", True)) or len(self.modes) <= 1:
+            self._preload_timer.stop()
+            return
+        limit = int(self.config.get("preload_modes", 2))
+        rings = mode_rings(self.current_mode_index, len(self.modes), limit)
+        current = self.mode_name(self.current_mode_index)
+        predicted = self.usage.predict_modes(
+            current,
+            [[self.mode_name(index) for index in ring] for ring in rings],
+            time.localtime().tm_hour,
+            limit,
+        )
+        order = [index for ring in rings for index in ring]
+        for name in predicted:
+            index = next(i for i in order if self.mode_name(i) == name)
+            self._predicted_modes.add(index)
+            buttons = sorted(
+                self.modes[index].get("buttons", []),
+                key=lambda e, n=name: -self.usage.press_count(n, e.get("label", "")),
+            )
+            self._preload_queue.extend(buttons)
+        if self._preload_queue:
+            self._preload_timer.start()
+
+    def preload_step(self):
+        if not self._preload_queue:
+            self._preload_timer.stop()
+            return
+        entry = self._preload_queue.popleft()
+        icon_path = entry.get("icon")
+        if icon_path:
+            self.icon_cache.preload(icon_path, self.icon_size(), self.devicePixelRatioF())
+        command = entry.get("command")
+        if isinstance(command, str):
+            resolve_command(command)
+
+    def closeEvent(self, event):
+        self._preload_timer.stop()
+        self.model.shortcuts.unbind(self)
+        self.model.persist_usage()
+        super().closeEvent(event)
 
     def persist_config(self):
-        self.config["modes"] = self.modes
-        self.config["current_mode_index"] = self.current_mode_index
-        self.config.pop("buttons", None)
-        save_config(self.config_path, self.config)
+        self.model.persist()
 
     def add_mode(self):
         name, ok = QtWidgets.QInputDialog.getText(self, APP_TITLE, "Mode name")
         if not ok:
             return
         name = name.strip() or f"Mode {len(self.modes) + 1}"
-        self.modes.append({"name": name, "buttons": []})
-        self.current_mode_index = len(self.modes) - 1
+        self.show_mode(self.model.append_mode({"name": name, "buttons": []}))
         self.persist_config()
-        self.update_mode_title()
-        self.render_buttons()
 
     def next_mode(self):
         if len(self.modes) <= 1:
             return
+        previous = self.current_mode_index
         self.current_mode_index = (self.current_mode_index + 1) % len(self.modes)
+        self.record_mode(previous)
         self.update_mode_title()
         self.render_buttons()
 
     def prev_mode(self):
         if len(self.modes) <= 1:
             return
+        previous = self.current_mode_index
         self.current_mode_index = (self.current_mode_index - 1) % len(self.modes)
+        self.record_mode(previous)
         self.update_mode_title()
         self.render_buttons()
 
@@ -697,8 +1541,185 @@ class TouchDeck(QtWidgets.QMainWindow):
         return super().eventFilter(obj, event)
 
 
-def main():
-    app = QtWidgets.QApplication(sys.argv)
+def export_filename(index, mode):
+    name = mode.get("name", f"Mode {index + 1}")
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", name).strip("-") or "mode"
+    return f"{index + 1:03d}-{slug}.png"
+
+
+def export_hash(config, mode, size):
+    style = {k: v for k, v in config.items() if k not in ("modes", "windows", "current_mode_index")}
+    icons = {}
+    for entry in mode.get("buttons", []):
+        icon_path = entry.get("icon")
+        if icon_path and os.path.exists(icon_path):
+            icons[icon_path] = os.path.getmtime(icon_path)
+    data = json.dumps([style, mode, icons, size], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def export_model(config_path, size):
+    model = DeckModel(config_path)
+    model.config.pop("windows", None)
+    model.config["fullscreen"] = False
+    model.config["window_width"], model.config["window_height"] = size
+    model.config["usage_tracking"] = False
+    model.config["preload"] = False
+    return model
+
+
+def export_render(config_path, out_dir, indexes, size):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([APP_TITLE])
+    window = TouchDeck(model=export_model(config_path, size))
+    window.setAttribute(QtCore.Qt.WidgetAttribute.WA_DontShowOnScreen)
+    window.show()
+    written = []
+    for index in indexes:
+        window.current_mode_index = index
+        window.update_mode_title()
+        window.render_buttons()
+        app.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete.value)
+        app.sendPostedEvents()
+        filename = export_filename(index, window.current_mode())
+        window.grab().save(os.path.join(out_dir, filename), "PNG")
+        written.append(filename)
+    window.close()
+    window.deleteLater()
+    return written
+
+
+def export_worker(config_path, out_dir, indexes, size):
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    return export_render(config_path, out_dir, indexes, size)
+
+
+def export_contact_sheet(out_dir, filenames, columns=4, thumb_width=480):
+    images = [QtGui.QImage(os.path.join(out_dir, name)) for name in filenames]
+    images = [image for image in images if not image.isNull()]
+    if not images:
+        return None
+    thumbs = [
+        image.scaledToWidth(thumb_width, QtCore.Qt.TransformationMode.SmoothTransformation)
+        for image in images
+    ]
+    thumb_height = max(thumb.height() for thumb in thumbs)
+    columns = min(columns, len(thumbs))
+    rows = math.ceil(len(thumbs) / columns)
+    sheet = QtGui.QImage(
+        columns * thumb_width, rows * thumb_height, QtGui.QImage.Format.Format_RGB32
+    )
+    sheet.fill(QtGui.QColor("#000000"))
+    painter = QtGui.QPainter(sheet)
+    for idx, thumb in enumerate(thumbs):
+        painter.drawImage((idx % columns) * thumb_width, (idx // columns) * thumb_height, thumb)
+    painter.end()
+    path = os.path.join(out_dir, "contact-sheet.png")
+    sheet.save(path, "PNG")
+    return path
+
+
+def export_deck(config_path, out_dir, size=None, jobs=None, contact_sheet=False):
+    config = load_config(config_path)
+    modes = config_modes(config)
+    if size is None:
+        size = (int(config.get("window_width", 1000)), int(config.get("window_height", 650)))
+    size = list(size)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    manifest = load_json(manifest_path)
+    if not isinstance(manifest, dict):
+        manifest = {}
+    previous = manifest.get("modes")
+    if not isinstance(previous, dict):
+        previous = {}
+
+    hashes = {}
+    pending = []
+    for index, mode in enumerate(modes):
+        filename = export_filename(index, mode)
+        hashes[filename] = export_hash(config, mode, size)
+        if previous.get(filename) != hashes[filename] or not os.path.exists(
+            os.path.join(out_dir, filename)
+        ):
+            pending.append(index)
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, math.ceil(len(pending) / 16)))
+    if jobs == 1:
+        if pending:
+            export_render(config_path, out_dir, pending, size)
+    else:
+        chunks = [pending[i::jobs] for i in range(jobs)]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            futures = [
+                pool.submit(export_worker, config_path, out_dir, chunk, size) for chunk in chunks
+            ]
+            for future in futures:
+                future.result()
+
+    removed = 0
+    for filename in previous:
+        if filename in hashes or os.path.basename(filename) != filename:
+            continue
+        path = os.path.join(out_dir, filename)
+        if filename.endswith(".png") and os.path.exists(path):
+            os.remove(path)
+            removed += 1
+
+    sheet = None
+    sheet_hash = manifest.get("contact_sheet")
+    if contact_sheet:
+        sheet = os.path.join(out_dir, "contact-sheet.png")
+        current_hash = hashlib.sha1(json.dumps(hashes).encode("utf-8")).hexdigest()
+        if sheet_hash != current_hash or not os.path.exists(sheet):
+            sheet = export_contact_sheet(out_dir, list(hashes))
+            sheet_hash = current_hash if sheet else None
+    save_json_atomic(manifest_path, {"modes": hashes, "contact_sheet": sheet_hash})
+    return {
+        "modes": len(modes),
+        "rendered": len(pending),
+        "skipped": len(modes) - len(pending),
+        "removed": removed,
+        "contact_sheet": sheet,
+    }
+
+
+def parse_size(text):
+    width, sep, height = text.lower().partition("x")
+    if not sep or not width.isdigit() or not height.isdigit() or not int(width) or not int(height):
+        raise argparse.ArgumentTypeError(f"invalid size {text!r}, expected WxH such as 1000x650")
+    return int(width), int(height)
+
+
+def parse_cli(argv):
+    parser = argparse.ArgumentParser(prog=APP_TITLE)
+    parser.add_argument("--config", help="path to touchdeck.json")
+    parser.add_argument(
+        "--replay",
+        metavar="LOG",
+        help="replay a recorded usage log and report preload hit rate",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="DIR",
+        help="render every mode to a PNG in DIR without showing the deck",
+    )
+    parser.add_argument(
+        "--contact-sheet",
+        action="store_true",
+        help="also combine the exported modes into contact-sheet.png",
+    )
+    parser.add_argument("--jobs", type=int, help="number of export processes")
+    parser.add_argument(
+        "--size",
+        metavar="WxH",
+        type=parse_size,
+        help="export window size, e.g. 1000x650",
+    )
+    return parser.parse_known_args(argv)
+
+
+def default_config_path():
     config_name = "touchdeck.json"
     config_dir = os.path.join(os.environ.get("LOCALAPPDATA", os.getcwd()), APP_TITLE)
     os.makedirs(config_dir, exist_ok=True)
@@ -719,9 +1740,35 @@ def main():
             if os.path.exists(fallback_config):
                 with open(fallback_config, "rb") as src, open(config_path, "wb") as dst:
                     dst.write(src.read())
+    return config_path
 
-    window = TouchDeck(config_path)
-    window.show()
+
+def main():
+    multiprocessing.freeze_support()
+    args, qt_args = parse_cli(sys.argv[1:])
+    config_path = args.config or default_config_path()
+
+    if args.replay:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QtGui.QGuiApplication(sys.argv[:1] + qt_args)
+        report = replay_usage(load_config(config_path), read_usage_events(args.replay))
+        print(json.dumps(report, indent=2))
+        return
+
+    if args.export:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+        report = export_deck(config_path, args.export, args.size, args.jobs, args.contact_sheet)
+        print(json.dumps(report, indent=2))
+        return
+
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    model = DeckModel(config_path)
+    windows = [
+        TouchDeck(model=model, slot=slot) for slot in range(len(model.window_configs()))
+    ]
+    for window in windows:
+        window.show()
     sys.exit(app.exec())
 
 
@@ -0,0 +1,25 @@
+import json
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    def write(config):
+        path = tmp_path / "touchdeck.json"
+        path.write_text(json.dumps(config), encoding="utf-8")
+        return str(path)
+
+    return write
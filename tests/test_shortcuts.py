@@ -0,0 +1,46 @@
+from PyQt6 import QtCore, QtTest
+
+import main
+
+
+def two_window_deck(qapp, write_config, shortcut_a, shortcut_b):
+    config = {
+        "fullscreen": False,
+        "windows": [{"current_mode_index": 0}, {"current_mode_index": 1}],
+        "modes": [
+            {"name": "A", "buttons": [{"label": "A-btn", "command": "x", "shortcut": shortcut_a}]},
+            {"name": "B", "buttons": [{"label": "B-btn", "command": "x", "shortcut": shortcut_b}]},
+        ],
+    }
+    model = main.DeckModel(write_config(config))
+    windows = [main.TouchDeck(model=model, slot=slot) for slot in (0, 1)]
+    launched = []
+    for window in windows:
+        window.launch_shortcut = lambda entry: launched.append(entry["label"])
+        window.rebuild_shortcuts()
+        window.show()
+    return windows, launched
+
+
+def press(qapp, window, key):
+    window.activateWindow()
+    qapp.processEvents()
+    QtTest.QTest.keyClick(window, key, QtCore.Qt.KeyboardModifier.ControlModifier)
+    qapp.processEvents()
+
+
+def test_focused_window_wins_shared_button_shortcut(qapp, write_config):
+    (a, b), launched = two_window_deck(qapp, write_config, "Ctrl+1", "Ctrl+1")
+    press(qapp, b, QtCore.Qt.Key.Key_1)
+    press(qapp, a, QtCore.Qt.Key.Key_1)
+    assert launched == ["B-btn", "A-btn"]
+
+
+def test_undo_in_edit_mode_beats_other_window_button(qapp, write_config):
+    (a, b), launched = two_window_deck(qapp, write_config, None, "Ctrl+Z")
+    a.activateWindow()
+    a.toggle_edit()
+    a.edit_current_mode([])
+    press(qapp, a, QtCore.Qt.Key.Key_Z)
+    assert [entry["label"] for entry in a.buttons] == ["A-btn"]
+    assert launched == []